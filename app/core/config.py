@@ -0,0 +1,33 @@
+"""
+Application Configuration
+
+Demonstrates:
+- Environment-driven settings via pydantic-settings
+- Sensible development defaults
+"""
+
+from typing import List
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Application settings loaded from environment variables / .env."""
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
+
+    PROJECT_NAME: str = "TaskFlow API"
+    # Explicit origins only: CORS is configured with allow_credentials=True
+    ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
+
+    # Database (async driver required, e.g. postgresql+asyncpg://...)
+    DATABASE_URL: str = "sqlite+aiosqlite:///./taskflow.db"
+    DATABASE_POOL_SIZE: int = 20
+    DATABASE_MAX_OVERFLOW: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_USE_LIFO: bool = True
+
+    # Logging: successful requests are logged 1 in LOG_SAMPLE_RATE
+    LOG_SAMPLE_RATE: int = 100
+
+
+settings = Settings()
@@ -15,14 +15,18 @@ Version: 1.0.0
 
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
+import os
+import orjson
 import uvicorn
 
 from app.api.v1 import router as api_v1_router
 from app.core.config import settings
 from app.core.database import init_db
-from app.middleware.logging import LoggingMiddleware
+from app.middleware.etag import ETagMiddleware, make_etag
+from app.middleware.logging import LoggingMiddleware, setup_logging
 
 
 @asynccontextmanager
@@ -30,10 +34,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan events handler."""
     # Startup
     print("Starting up TaskFlow API...")
-    await init_db()
-    yield
-    # Shutdown
-    print("Shutting down TaskFlow API...")
+    log_listener = setup_logging()
+    log_listener.start()
+    try:
+        await init_db()
+        yield
+        # Shutdown
+        print("Shutting down TaskFlow API...")
+    finally:
+        # Flush queued records even if startup fails
+        log_listener.stop()
 
 
 # Initialize FastAPI application
@@ -73,38 +83,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Custom Logging Middleware
+# Conditional GET (ETag / 304 Not Modified)
+app.add_middleware(ETagMiddleware)
+
+# Custom Logging Middleware (added last so it wraps ETagMiddleware and
+# logs the final status, e.g. 304 rather than the inner 200)
 app.add_middleware(LoggingMiddleware)
 
 # Include API routers
 app.include_router(api_v1_router, prefix="/api/v1")
 
 
+# Health payloads are constant, so serialize them once at import time
+_ROOT_BYTES = orjson.dumps({
+    "status": "healthy",
+    "message": "Welcome to TaskFlow API",
+    "version": "1.0.0",
+    "docs": "/docs"
+})
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "database": "connected",
+    "cache": "available"
+})
+_ROOT_HEADERS = {"Cache-Control": "public, max-age=1", "ETag": make_etag(_ROOT_BYTES)}
+_HEALTH_HEADERS = {"Cache-Control": "public, max-age=1", "ETag": make_etag(_HEALTH_BYTES)}
+
+
 @app.get("/", tags=["Health"])
 async def root():
     """Root endpoint - API health check."""
-    return {
-        "status": "healthy",
-        "message": "Welcome to TaskFlow API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json", headers=_ROOT_HEADERS)
 
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Detailed health check endpoint."""
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "cache": "available"
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json", headers=_HEALTH_HEADERS)
 
 
 if __name__ == "__main__":
+    # RELOAD=1 for local development (uvicorn then runs a single worker).
+    # WORKERS defaults to 1: each worker runs create_all on startup, which
+    # races on the default SQLite file. Set e.g. WORKERS=$((2 * nproc + 1))
+    # in production. "auto" picks uvloop/httptools when they are installed.
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True
+        port=int(os.environ.get("PORT", 8000)),
+        workers=int(os.environ.get("WORKERS", 1)),
+        loop="auto",
+        http="auto",
+        reload=os.environ.get("RELOAD") == "1",
+        access_log=False,
     )
@@ -0,0 +1,96 @@
+"""
+ETag Middleware - Conditional GET Support
+
+Demonstrates:
+- Buffering and hashing response bodies
+- HTTP 304 Not Modified short-circuiting via If-None-Match
+"""
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import xxhash
+
+    def _hash(body: bytes) -> str:
+        return xxhash.xxh64(body).hexdigest()
+except ImportError:  # fallback when xxhash is not installed
+    import hashlib
+
+    def _hash(body: bytes) -> str:
+        return hashlib.md5(body, usedforsecurity=False).hexdigest()
+
+
+def make_etag(body: bytes) -> str:
+    """Build a quoted strong ETag for a response body."""
+    return f'"{_hash(body)}"'
+
+
+def _opaque(tag: str) -> str:
+    """Strip the weak ``W/`` prefix so tags compare weakly."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against ``etag`` using weak comparison."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(tag) == target for tag in if_none_match.split(","))
+
+
+# Headers a 304 must repeat from the 200 it stands in for (RFC 9110 15.4.5)
+_NOT_MODIFIED_HEADERS = (b"cache-control", b"content-location", b"expires", b"vary")
+
+
+def _not_modified(response: Response, etag: str) -> Response:
+    """Build a 304 that keeps the caching and CORS headers of ``response``."""
+    not_modified = Response(status_code=304)
+    # Work on raw header pairs so repeated headers (e.g. Vary) survive
+    not_modified.raw_headers = [
+        (key, value)
+        for key, value in response.raw_headers
+        if key.lower() in _NOT_MODIFIED_HEADERS or key.lower().startswith(b"access-control-")
+    ]
+    not_modified.raw_headers.append((b"etag", etag.encode("latin-1")))
+    return not_modified
+
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """Attach ETags to JSON GET responses and answer 304 when unchanged."""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        response = await call_next(request)
+
+        if request.method != "GET" or response.status_code != 200:
+            return response
+        # Leave non-JSON payloads untouched
+        if not response.headers.get("content-type", "").startswith("application/json"):
+            return response
+
+        # Endpoints may precompute their ETag; avoid re-hashing in that case
+        etag = response.headers.get("etag")
+        if etag is not None:
+            if _matches(request, etag):
+                return _not_modified(response, etag)
+            return response
+
+        # Streaming responses carry no Content-Length; don't buffer them
+        if "content-length" not in response.headers:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = make_etag(body)
+
+        if _matches(request, etag):
+            return _not_modified(response, etag)
+
+        buffered = Response(content=body, status_code=response.status_code)
+        # Keep the raw header list: a dict would collapse repeated Set-Cookie
+        buffered.raw_headers = [*response.raw_headers, (b"etag", etag.encode("latin-1"))]
+        return buffered
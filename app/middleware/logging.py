@@ -0,0 +1,82 @@
+"""
+Logging Middleware - Sampled Request Logging
+
+Demonstrates:
+- Off-loop log I/O via QueueHandler / QueueListener
+- Sampling successful requests while always logging errors
+"""
+
+import itertools
+import logging
+import logging.handlers
+import queue
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("taskflow.requests")
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted so formatting runs on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route request logs through an in-process queue.
+    
+    Returns the (unstarted) listener that drains the queue on a
+    background thread; the caller is responsible for start()/stop().
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+    )
+    logger.handlers[:] = [_DeferredQueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+
+class LoggingMiddleware(BaseHTTPMiddleware):
+    """Log request method, path, status and latency; 2xx/3xx are sampled 1 in N."""
+
+    def __init__(self, app: ASGIApp, sample_rate: int = settings.LOG_SAMPLE_RATE):
+        super().__init__(app)
+        self.sample_rate = max(1, sample_rate)
+        self._counter = itertools.count()
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start = time.perf_counter()
+        response = await call_next(request)
+        status_code = response.status_code
+
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400:
+            level = logging.WARNING
+        elif next(self._counter) % self.sample_rate == 0:
+            level = logging.INFO
+        else:
+            return response
+
+        if logger.isEnabledFor(level):
+            logger.log(
+                level,
+                "%s %s %d %.2fms",
+                request.method,
+                request.url.path,
+                status_code,
+                (time.perf_counter() - start) * 1000,
+            )
+        return response
@@ -9,15 +9,22 @@ Demonstrates:
 - Field validation
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey, Boolean, Index, event, false
+from sqlalchemy.orm import Session, relationship, validates, with_loader_criteria
 from sqlalchemy.sql import func
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 import enum
+import time
 
 from app.core.database import Base
 
 
+# Module-level bindings avoid attribute lookups on hot paths
+_utcnow = datetime.now
+_UTC = timezone.utc
+
+
 class TaskStatus(str, enum.Enum):
     """Task status enumeration."""
     PENDING = "pending"
@@ -34,6 +41,35 @@ class TaskPriority(str, enum.Enum):
     URGENT = "urgent"
 
 
+def utcnow_naive() -> datetime:
+    """
+    Current UTC time as a naive datetime.
+    
+    due_date and deleted_at are naive columns holding UTC, so this is
+    the "now" to store in or compare against them.
+    """
+    return _utcnow(_UTC).replace(tzinfo=None)
+
+
+def to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Convert a datetime to a POSIX timestamp, treating naive values as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_UTC)
+    return value.timestamp()
+
+
+def compute_overdue(now_ts: float, due_ts: Optional[float], status: TaskStatus) -> bool:
+    """
+    Check whether a task is overdue.
+    
+    Takes a precomputed ``now_ts`` so list endpoints can read the clock
+    once per request instead of once per task.
+    """
+    return due_ts is not None and status is not TaskStatus.COMPLETED and now_ts > due_ts
+
+
 class Task(Base):
     """
     Task database model.
@@ -51,17 +87,28 @@ class Task(Base):
         is_deleted: Soft delete flag
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_overdue", "status", "is_deleted", "due_date"),
+        Index(
+            "ix_tasks_owner_status_due",
+            "owner_id", "is_deleted", "status", "due_date",
+            postgresql_include=["priority"],
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    title = Column(String(255), nullable=False, index=True)
+    title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
+    # Stored as VARCHAR(16) holding member names, as before (no native DB enum).
+    # Existing Postgres tables keep their native enum type until migrated with
+    # ALTER TABLE tasks ALTER COLUMN status TYPE VARCHAR(16) (same for priority).
     status = Column(
-        Enum(TaskStatus),
+        Enum(TaskStatus, native_enum=False, length=16),
         default=TaskStatus.PENDING,
         nullable=False
     )
     priority = Column(
-        Enum(TaskPriority),
+        Enum(TaskPriority, native_enum=False, length=16),
         default=TaskPriority.MEDIUM,
         nullable=False
     )
@@ -76,16 +123,26 @@ class Task(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Soft delete
-    is_deleted = Column(Boolean, default=False)
+    # NOT NULL with a server default: the global soft-delete filter tests
+    # "is_deleted IS false", which would hide NULLs from raw inserts
+    is_deleted = Column(Boolean, default=False, server_default=false(), nullable=False)
     deleted_at = Column(DateTime, nullable=True)
     
     def __repr__(self):
         return f"<Task(id={self.id}, title='{self.title}', status={self.status})>"
     
+    @validates("status", "priority")
+    def _coerce_enum(self, key, value):
+        """Coerce raw strings to enum members so identity checks hold."""
+        if value is None:
+            return value
+        enum_cls = TaskStatus if key == "status" else TaskPriority
+        return enum_cls(value)
+    
     def soft_delete(self):
         """Perform soft delete on the task."""
         self.is_deleted = True
-        self.deleted_at = datetime.utcnow()
+        self.deleted_at = utcnow_naive()
     
     def restore(self):
         """Restore a soft-deleted task."""
@@ -95,6 +152,22 @@ class Task(Base):
     @property
     def is_overdue(self) -> bool:
         """Check if task is overdue."""
-        if self.due_date and self.status != TaskStatus.COMPLETED:
-            return datetime.utcnow() > self.due_date
-        return False
+        return compute_overdue(time.time(), to_timestamp(self.due_date), self.status)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_soft_deleted(execute_state):
+    """
+    Hide soft-deleted tasks from every ORM SELECT.
+    
+    Pass ``execution_options(include_deleted=True)`` to opt out.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Task, lambda cls: cls.is_deleted.is_(False), include_aliases=True)
+        )
@@ -0,0 +1,105 @@
+"""
+Task Service - Database Queries for Tasks
+
+Demonstrates:
+- Async SQLAlchemy 2.0 select() queries
+- Pushing filters into SQL instead of Python loops
+
+Soft-deleted tasks are excluded from SELECTs globally by the
+do_orm_execute hook in app.models.task.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import ColumnElement, and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task, TaskPriority, TaskStatus, utcnow_naive
+
+
+def _overdue_clause() -> ColumnElement[bool]:
+    """
+    SQL predicate for unfinished tasks past their due date.
+    
+    "now" is bound from Python: due_date is naive UTC, and comparing it
+    with the database's now() would depend on the server's TimeZone.
+    """
+    return and_(
+        Task.due_date < utcnow_naive(),
+        Task.status != TaskStatus.COMPLETED,
+    )
+
+
+async def get_overdue_tasks(db: AsyncSession, owner_id: Optional[int] = None) -> List[Task]:
+    """
+    Fetch live tasks past their due date that are not completed.
+    
+    The predicate runs in the database (backed by ``ix_tasks_overdue``)
+    rather than evaluating ``Task.is_overdue`` per row.
+    """
+    stmt = select(Task).where(_overdue_clause())
+    if owner_id is not None:
+        stmt = stmt.where(Task.owner_id == owner_id)
+    result = await db.execute(stmt.order_by(Task.due_date))
+    return list(result.scalars().all())
+
+
+async def get_owner_tasks(
+    db: AsyncSession,
+    owner_id: int,
+    status: Optional[TaskStatus] = None,
+) -> List[Task]:
+    """Fetch an owner's live tasks, optionally by status, ordered by due date."""
+    stmt = select(Task).where(Task.owner_id == owner_id)
+    if status is not None:
+        stmt = stmt.where(Task.status == status)
+    result = await db.execute(stmt.order_by(Task.due_date))
+    return list(result.scalars().all())
+
+
+async def count_overdue_by_priority(
+    db: AsyncSession,
+    owner_id: Optional[int] = None,
+) -> Dict[TaskPriority, int]:
+    """Count overdue tasks per priority with a single GROUP BY query."""
+    stmt = (
+        select(Task.priority, func.count())
+        .where(_overdue_clause())
+        .group_by(Task.priority)
+    )
+    if owner_id is not None:
+        stmt = stmt.where(Task.owner_id == owner_id)
+    counts = {priority: 0 for priority in TaskPriority}
+    for priority, count in (await db.execute(stmt)).all():
+        counts[priority] = count
+    return counts
+
+
+async def bulk_soft_delete(
+    db: AsyncSession,
+    task_ids: Iterable[int],
+    owner_id: Optional[int] = None,
+) -> int:
+    """
+    Soft delete many tasks with a single UPDATE statement.
+    
+    ``deleted_at`` is stamped with utcnow_naive(), read in Python like
+    ``Task.soft_delete``; the database's now() would store server-local
+    time in the naive column. Returns the number of tasks that were
+    newly deleted. The caller owns the transaction and commits; Task
+    objects already loaded in the session are not synchronized and
+    should be refreshed if used afterwards.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return 0
+    stmt = (
+        update(Task)
+        .where(Task.id.in_(task_ids), Task.is_deleted.is_(False))
+        .values(is_deleted=True, deleted_at=utcnow_naive())
+        .execution_options(synchronize_session=False)
+    )
+    if owner_id is not None:
+        stmt = stmt.where(Task.owner_id == owner_id)
+    result = await db.execute(stmt)
+    return result.rowcount
@@ -3,73 +3,121 @@ Unit Tests for Task API Endpoints
 
 Demonstrates:
 - pytest fixtures for test setup
-- FastAPI TestClient usage
+- httpx AsyncClient over ASGITransport (plus a TestClient smoke test)
 - Mocking database sessions
 - Testing CRUD operations
 - Authentication testing
 - Edge case handling
 """
 
+import logging
+
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 from datetime import datetime, timedelta
 
 from app.main import app
 from app.core.database import Base, get_db
-from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.task import Task, TaskStatus, TaskPriority, compute_overdue, to_timestamp
+from app.middleware.etag import ETagMiddleware
+from app.middleware.logging import LoggingMiddleware, logger as request_logger
 from app.models.user import User
+from app.services.task_service import (
+    bulk_soft_delete,
+    count_overdue_by_priority,
+    get_overdue_tasks,
+    get_owner_tasks,
+)
 
 
 # Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-engine = create_engine(
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
+# Sessions join the per-test outer transaction; commits become SAVEPOINTs
+TestingSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+    join_transaction_mode="create_savepoint",
+)
 
-def override_get_db():
-    """Override database dependency for testing."""
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
 
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    """Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work on SQLite."""
+    dbapi_connection.isolation_level = None
 
-app.dependency_overrides[get_db] = override_get_db
 
-client = TestClient(app)
+@event.listens_for(engine.sync_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
 
-@pytest.fixture(autouse=True)
-def setup_database():
-    """Create tables before each test, drop after."""
-    Base.metadata.create_all(bind=engine)
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _schema():
+    """Create tables once for the whole test session."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     yield
-    Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
 
 
-@pytest.fixture
-def test_user():
+@pytest_asyncio.fixture(autouse=True, loop_scope="session")
+async def db_session(_schema):
+    """
+    Yield one session shared by the test and the app under test.
+    
+    The session is bound to a connection whose outer transaction is
+    rolled back after the test, so nothing persists between tests.
+    """
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        async with TestingSessionLocal(bind=conn) as db:
+
+            async def override_get_db():
+                """Override database dependency for testing."""
+                yield db
+
+            app.dependency_overrides[get_db] = override_get_db
+            yield db
+            app.dependency_overrides.pop(get_db, None)
+        await trans.rollback()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def test_user(db_session):
     """Create a test user for task ownership."""
-    db = TestingSessionLocal()
     user = User(
         email="test@example.com",
         hashed_password="hashedpassword123",
         full_name="Test User"
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    yield user
-    db.close()
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return user
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def client():
+    """Async HTTP client that calls the app in-process."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
 
 
 @pytest.fixture
@@ -78,28 +126,161 @@ def auth_headers():
     return {"Authorization": "Bearer test_token"}
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestHealthEndpoints:
     """Test health check endpoints."""
     
-    def test_root_endpoint(self):
+    async def test_root_endpoint(self, client):
         """Test root endpoint returns healthy status."""
-        response = client.get("/")
+        response = await client.get("/")
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
     
+    async def test_etag_not_modified(self, client):
+        """Test repeated GET with matching If-None-Match returns 304."""
+        response = await client.get("/health")
+        etag = response.headers["ETag"]
+        cached = await client.get("/health", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+        assert cached.headers["Cache-Control"] == "public, max-age=1"
+
+    async def test_etag_weak_and_wildcard_match(self, client):
+        """Test If-None-Match uses weak comparison and honours '*'."""
+        etag = (await client.get("/")).headers["ETag"]
+        weak = await client.get("/", headers={"If-None-Match": f"W/{etag}"})
+        assert weak.status_code == 304
+        wildcard = await client.get("/", headers={"If-None-Match": "*"})
+        assert wildcard.status_code == 304
+        other = await client.get("/", headers={"If-None-Match": '"other"'})
+        assert other.status_code == 200
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def etag_client():
+    """Client for a bare Starlette app wrapped in ETagMiddleware."""
+    async def json_with_cookies(request):
+        response = JSONResponse({"tasks": [1, 2, 3]})
+        response.set_cookie("first", "1")
+        response.set_cookie("second", "2")
+        return response
+    
+    async def json_stream(request):
+        return StreamingResponse(iter([b'{"tasks": ', b"[]}"]), media_type="application/json")
+    
+    async def plain_text(request):
+        return PlainTextResponse("hello")
+    
+    async def json_not_found(request):
+        return JSONResponse({"detail": "Not found"}, status_code=404)
+    
+    etag_app = Starlette(
+        routes=[
+            Route("/json", json_with_cookies),
+            Route("/stream", json_stream),
+            Route("/text", plain_text),
+            Route("/missing", json_not_found),
+        ],
+        middleware=[Middleware(ETagMiddleware)],
+    )
+    async with AsyncClient(transport=ASGITransport(app=etag_app), base_url="http://test") as c:
+        yield c
+
+
+@pytest.mark.asyncio(loop_scope="session")
+class TestETagMiddleware:
+    """Test ETag hashing and pass-through paths."""
+    
+    async def test_json_body_hashed(self, etag_client):
+        """Test a JSON body gets an ETag and keeps repeated headers."""
+        response = await etag_client.get("/json")
+        assert response.status_code == 200
+        assert response.json() == {"tasks": [1, 2, 3]}
+        assert len(response.headers.get_list("set-cookie")) == 2
+        etag = response.headers["ETag"]
+        
+        cached = await etag_client.get("/json", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+    
+    async def test_streaming_response_not_buffered(self, etag_client):
+        """Test bodies without Content-Length pass through untouched."""
+        response = await etag_client.get("/stream")
+        assert response.status_code == 200
+        assert response.json() == {"tasks": []}
+        assert "etag" not in response.headers
+    
+    async def test_non_json_and_errors_untouched(self, etag_client):
+        """Test non-JSON and non-200 responses get no ETag."""
+        text = await etag_client.get("/text")
+        assert text.text == "hello"
+        assert "etag" not in text.headers
+        missing = await etag_client.get("/missing")
+        assert missing.status_code == 404
+        assert "etag" not in missing.headers
+
+
+@pytest.mark.asyncio(loop_scope="session")
+class TestLoggingMiddleware:
+    """Test request log sampling."""
+    
+    async def test_sampling(self, caplog):
+        """Test errors are always logged and 2xx only 1 in sample_rate."""
+        async def endpoint(request):
+            return PlainTextResponse("", status_code=int(request.path_params["code"]))
+        
+        sampled_app = Starlette(
+            routes=[Route("/{code:int}", endpoint)],
+            middleware=[Middleware(LoggingMiddleware, sample_rate=2)],
+        )
+        # Capture directly on the logger, whether or not it propagates to root
+        propagate = request_logger.propagate
+        request_logger.propagate = False
+        request_logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.INFO, logger=request_logger.name):
+                transport = ASGITransport(app=sampled_app)
+                async with AsyncClient(transport=transport, base_url="http://test") as c:
+                    for code in (200, 200, 404, 200, 200, 500):
+                        await c.get(f"/{code}")
+        finally:
+            request_logger.removeHandler(caplog.handler)
+            request_logger.propagate = propagate
+        
+        # Errors don't advance the sampling counter: 2xx #1 and #3 are kept
+        logged = [
+            (record.levelno, record.args[2])
+            for record in caplog.records
+            if record.name == request_logger.name
+        ]
+        assert logged == [
+            (logging.INFO, 200),
+            (logging.WARNING, 404),
+            (logging.INFO, 200),
+            (logging.ERROR, 500),
+        ]
+
+
+class TestSyncSmoke:
+    """Sync smoke test through the threaded TestClient."""
+    
     def test_health_check(self):
         """Test detailed health check."""
-        response = client.get("/health")
+        response = TestClient(app).get("/health")
         assert response.status_code == 200
         data = response.json()
         assert "status" in data
         assert "database" in data
+        assert response.headers["Cache-Control"] == "public, max-age=1"
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestTaskCRUD:
     """Test Task CRUD operations."""
     
-    def test_create_task(self, test_user, auth_headers):
+    async def test_create_task(self, client, test_user, auth_headers):
         """Test creating a new task."""
         task_data = {
             "title": "Test Task",
@@ -107,7 +288,7 @@ class TestTaskCRUD:
             "priority": "high",
             "due_date": (datetime.utcnow() + timedelta(days=7)).isoformat()
         }
-        response = client.post(
+        response = await client.post(
             "/api/v1/tasks/",
             json=task_data,
             headers=auth_headers
@@ -115,52 +296,53 @@ class TestTaskCRUD:
         # Note: Would be 201 with proper auth setup
         assert response.status_code in [200, 201, 401]
     
-    def test_get_tasks(self, auth_headers):
+    async def test_get_tasks(self, client, auth_headers):
         """Test retrieving all tasks."""
-        response = client.get("/api/v1/tasks/", headers=auth_headers)
+        response = await client.get("/api/v1/tasks/", headers=auth_headers)
         assert response.status_code in [200, 401]
     
-    def test_get_task_by_id(self, auth_headers):
+    async def test_get_task_by_id(self, client, auth_headers):
         """Test retrieving a specific task."""
-        response = client.get("/api/v1/tasks/1", headers=auth_headers)
+        response = await client.get("/api/v1/tasks/1", headers=auth_headers)
         assert response.status_code in [200, 404, 401]
     
-    def test_update_task(self, auth_headers):
+    async def test_update_task(self, client, auth_headers):
         """Test updating a task."""
         update_data = {"title": "Updated Task Title"}
-        response = client.put(
+        response = await client.put(
             "/api/v1/tasks/1",
             json=update_data,
             headers=auth_headers
         )
         assert response.status_code in [200, 404, 401]
     
-    def test_delete_task(self, auth_headers):
+    async def test_delete_task(self, client, auth_headers):
         """Test deleting a task."""
-        response = client.delete("/api/v1/tasks/1", headers=auth_headers)
+        response = await client.delete("/api/v1/tasks/1", headers=auth_headers)
         assert response.status_code in [200, 204, 404, 401]
 
 
+@pytest.mark.asyncio(loop_scope="session")
 class TestTaskValidation:
     """Test input validation for tasks."""
     
-    def test_create_task_missing_title(self, auth_headers):
+    async def test_create_task_missing_title(self, client, auth_headers):
         """Test creating task without title fails."""
         task_data = {"description": "No title provided"}
-        response = client.post(
+        response = await client.post(
             "/api/v1/tasks/",
             json=task_data,
             headers=auth_headers
         )
         assert response.status_code in [422, 401]
     
-    def test_invalid_priority_value(self, auth_headers):
+    async def test_invalid_priority_value(self, client, auth_headers):
         """Test invalid priority enum value."""
         task_data = {
             "title": "Test Task",
             "priority": "invalid_priority"
         }
-        response = client.post(
+        response = await client.post(
             "/api/v1/tasks/",
             json=task_data,
             headers=auth_headers
@@ -168,6 +350,95 @@ class TestTaskValidation:
         assert response.status_code in [422, 401]
 
 
+@pytest.mark.asyncio(loop_scope="session")
+class TestTaskService:
+    """Test task service queries."""
+    
+    async def test_get_overdue_tasks(self, db_session, test_user):
+        """Test only live, unfinished tasks past their due date are returned."""
+        past = datetime.utcnow() - timedelta(days=1)
+        overdue = Task(title="Overdue", due_date=past, owner_id=test_user.id)
+        future = Task(
+            title="Future",
+            due_date=datetime.utcnow() + timedelta(days=1),
+            owner_id=test_user.id
+        )
+        completed = Task(
+            title="Completed",
+            due_date=past,
+            status=TaskStatus.COMPLETED,
+            owner_id=test_user.id
+        )
+        deleted = Task(title="Deleted", due_date=past, owner_id=test_user.id)
+        deleted.soft_delete()
+        db_session.add_all([overdue, future, completed, deleted])
+        await db_session.commit()
+        
+        tasks = await get_overdue_tasks(db_session, owner_id=test_user.id)
+        assert [task.id for task in tasks] == [overdue.id]
+    
+    async def test_count_overdue_by_priority(self, db_session, test_user):
+        """Test counts are keyed by TaskPriority and zero-filled."""
+        past = datetime.utcnow() - timedelta(days=1)
+        db_session.add_all([
+            Task(title="High 1", due_date=past, priority=TaskPriority.HIGH, owner_id=test_user.id),
+            Task(title="High 2", due_date=past, priority=TaskPriority.HIGH, owner_id=test_user.id),
+            Task(title="Low", due_date=past, priority=TaskPriority.LOW, owner_id=test_user.id),
+            Task(
+                title="Done",
+                due_date=past,
+                priority=TaskPriority.URGENT,
+                status=TaskStatus.COMPLETED,
+                owner_id=test_user.id
+            ),
+        ])
+        await db_session.commit()
+        
+        counts = await count_overdue_by_priority(db_session, owner_id=test_user.id)
+        assert counts == {
+            TaskPriority.LOW: 1,
+            TaskPriority.MEDIUM: 0,
+            TaskPriority.HIGH: 2,
+            TaskPriority.URGENT: 0,
+        }
+        assert all(type(priority) is TaskPriority for priority in counts)
+    
+    async def test_bulk_soft_delete(self, db_session, test_user):
+        """Test bulk soft delete only touches the requested live tasks."""
+        tasks = [Task(title=f"Task {i}", owner_id=test_user.id) for i in range(3)]
+        db_session.add_all(tasks)
+        await db_session.commit()
+        
+        deleted = await bulk_soft_delete(db_session, [tasks[0].id, tasks[1].id])
+        assert deleted == 2
+        # Already-deleted tasks are not counted again
+        assert await bulk_soft_delete(db_session, [tasks[0].id]) == 0
+        assert await bulk_soft_delete(db_session, []) == 0
+        await db_session.commit()
+        
+        for task in tasks:
+            await db_session.refresh(task)
+        assert [task.is_deleted for task in tasks] == [True, True, False]
+        assert tasks[0].deleted_at is not None
+    
+    async def test_soft_deleted_tasks_hidden(self, db_session, test_user):
+        """Test soft-deleted tasks are filtered from queries by default."""
+        live = Task(title="Live Task", owner_id=test_user.id)
+        gone = Task(title="Deleted Task", owner_id=test_user.id)
+        db_session.add_all([live, gone])
+        await db_session.commit()
+        await bulk_soft_delete(db_session, [gone.id])
+        await db_session.commit()
+        
+        tasks = await get_owner_tasks(db_session, test_user.id)
+        assert [task.id for task in tasks] == [live.id]
+        
+        result = await db_session.execute(
+            select(Task).execution_options(include_deleted=True)
+        )
+        assert {task.id for task in result.scalars()} == {live.id, gone.id}
+
+
 class TestTaskModel:
     """Test Task model methods."""
     
@@ -208,6 +479,26 @@ class TestTaskModel:
         task.due_date = datetime.utcnow() + timedelta(days=1)
         assert task.is_overdue is False
 
+    def test_compute_overdue(self):
+        """Test compute_overdue against a shared timestamp."""
+        now = datetime.utcnow()
+        now_ts = to_timestamp(now)
+        past_ts = to_timestamp(now - timedelta(hours=1))
+        assert compute_overdue(now_ts, past_ts, TaskStatus.PENDING) is True
+        assert compute_overdue(now_ts, past_ts, TaskStatus.COMPLETED) is False
+        assert compute_overdue(now_ts, None, TaskStatus.PENDING) is False
+
+    def test_status_string_coerced_to_enum(self):
+        """Test raw status strings are coerced to enum members."""
+        task = Task(
+            title="Done Task",
+            status="completed",
+            due_date=datetime.utcnow() - timedelta(days=1),
+            owner_id=1
+        )
+        assert task.status is TaskStatus.COMPLETED
+        assert task.is_overdue is False
+
 
 if __name__ == "__main__":
     pytest.main(["-v", __file__])